@@ -1,14 +1,20 @@
 import streamlit as st
 import random
 import csv
-from typing import Optional, Dict, Any
-from datetime import datetime
+import base64
+from typing import Optional, Dict, Any, Tuple
+from datetime import datetime, timezone
 from pathlib import Path
 import io
 import os
 import shutil
-import traceback
-from typing import Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import requests  # only needed for the optional GitHub backup
+except ImportError:
+    requests = None
 
 # ----------------- PAGE CONFIG -----------------
 st.set_page_config(page_title="Self-Disclosure Game", page_icon="💬")
@@ -39,12 +45,138 @@ CSV_HEADERS = [
 ]
 # App stores data in a local CSV on the server; users can download it from the sidebar.
 
+
 # If the CSV file doesn't exist yet, create it with a header row
 if not DATA_FILE.exists():
     with open(DATA_FILE, "w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
         writer.writerow(CSV_HEADERS)
 
+
+@st.cache_resource
+def _row_counter() -> Dict[str, Optional[int]]:
+    """Process-wide count of data lines in DATA_FILE and the file size it was taken at."""
+    return {"n": None, "size": None}
+
+
+def count_saved_rows() -> int:
+    """Number of data rows saved on the server (header excluded).
+    Only a stat() per call: the file is rescanned only when its size no longer matches
+    the size the counter was last brought up to date with (e.g. another process wrote to it).
+    """
+    counter = _row_counter()
+    # Same lock append_to_data_file holds while it updates the counter
+    with _csv_mirror()["lock"]:
+        size = DATA_FILE.stat().st_size if DATA_FILE.exists() else 0
+        if counter["n"] is None or counter["size"] != size:
+            counter["n"] = _count_lines(DATA_FILE) if size else 0
+            counter["size"] = size
+        return counter["n"]
+
+
+def _count_lines(path: Path) -> int:
+    """Count data lines (header excluded) by scanning 1 MiB chunks for newlines."""
+    total = -1  # subtract header
+    with open(path, "rb", buffering=1 << 20) as f:
+        while chunk := f.read(1 << 20):
+            total += chunk.count(b"\n")
+    return max(total, 0)
+
+
+def _file_version(path: Path) -> Tuple[int, int]:
+    """(mtime in ns, size) cache key; the size catches appends within one mtime tick."""
+    stat_result = path.stat()
+    return stat_result.st_mtime_ns, stat_result.st_size
+
+
+@st.cache_data(ttl=10)
+def _read_csv_bytes(path: str, version: Tuple[int, int]) -> bytes:
+    """Raw CSV bytes for download buttons; `version` is only part of the cache key."""
+    return Path(path).read_bytes()
+
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def load_rows(path_str: str, version: Tuple[int, int]) -> list:
+    """Parsed CSV rows (list of dicts); `version` is only part of the cache key."""
+    # Decode the bytes directly (no newline translation) so quoted multi-line fields survive
+    text = Path(path_str).read_bytes().decode("utf-8-sig")
+    return list(csv.DictReader(io.StringIO(text, newline="")))
+
+
+# In-memory copy of DATA_FILE for the GitHub backup, so a submission doesn't have to
+# re-read the whole file after appending to it. Dropped once the file grows past this size.
+CSV_MIRROR_MAX_BYTES = 8 * 1024 * 1024
+
+
+@st.cache_resource
+def _csv_mirror() -> Dict[str, Any]:
+    """Process-wide mirror of DATA_FILE; the lock also serializes appends to the file."""
+    return {"lock": threading.Lock(), "data": None, "size": None}
+
+
+def append_to_data_file(data: bytes) -> None:
+    """Append already-encoded CSV rows to DATA_FILE and keep the mirror and row counter in step."""
+    mirror = _csv_mirror()
+    with mirror["lock"]:
+        counter = _row_counter()
+        # If the file was deleted or rotated since this rerun started, restore the header row
+        if not DATA_FILE.exists() or DATA_FILE.stat().st_size == 0:
+            data = (",".join(CSV_HEADERS) + "\r\n").encode("utf-8") + data
+            counter["n"] = None
+            mirror["data"] = None
+        with open(DATA_FILE, "ab", buffering=1 << 16) as f:
+            f.write(data)
+        if counter["n"] is not None:
+            counter["n"] += data.count(b"\n")
+            counter["size"] += len(data)
+        if mirror["data"] is not None:
+            mirror["data"] += data
+            mirror["size"] += len(data)
+            if len(mirror["data"]) > CSV_MIRROR_MAX_BYTES:
+                mirror["data"] = None
+
+
+def csv_bytes_for_backup(mirror: Optional[Dict[str, Any]] = None) -> bytes:
+    """Full DATA_FILE contents, served from the mirror while it still matches the file size
+    (it is reloaded if another process appended to the file or it was replaced).
+    Background threads pass in the mirror resolved on the script thread.
+    """
+    if mirror is None:
+        mirror = _csv_mirror()
+    with mirror["lock"]:
+        if mirror["data"] is None or mirror["size"] != DATA_FILE.stat().st_size:
+            content = DATA_FILE.read_bytes()
+            if len(content) <= CSV_MIRROR_MAX_BYTES:
+                mirror["data"] = bytearray(content)
+                mirror["size"] = len(content)
+            else:
+                mirror["data"] = None
+            return content
+        return bytes(mirror["data"])
+
+
+# Submission rows have a fixed shape: only netid, partner_message and strategy_text
+# are free text, everything else is a timestamp, a condition name or a small int.
+# Set to False to fall back to csv.writer.
+FAST_CSV_ROWS = True
+_FREE_TEXT_COLUMNS = frozenset(
+    CSV_HEADERS.index(name) for name in ("netid", "partner_message", "strategy_text")
+)
+
+
+def _q(s: str) -> str:
+    """Quote a free-text field the way csv.writer's QUOTE_MINIMAL would."""
+    if '"' in s or "," in s or "\n" in s or "\r" in s:
+        return '"' + s.replace('"', '""') + '"'
+    return s
+
+
+def _format_row(fields) -> str:
+    """Format one submission row as a CSV line, byte-identical to csv.writer output."""
+    return ",".join(
+        _q(str(x)) if i in _FREE_TEXT_COLUMNS else str(x) for i, x in enumerate(fields)
+    ) + "\r\n"
+
 # ----------------- OPTIONAL: GITHUB BACKUP (NO ACCOUNT REQUIRED UNLESS YOU WANT IT) -----------------
 GITHUB_TOKEN = None
 GITHUB_REPO = None
@@ -62,22 +194,74 @@ except Exception:
     GITHUB_PATH = None
 
 
-def push_csv_to_github(csv_bytes: bytes) -> bool:
+@st.cache_resource
+def _github_http_session():
+    """Keep-alive HTTP session shared by all GitHub backup calls in this process."""
+    return requests.Session()
+
+
+@st.cache_resource
+def _github_backup_executor() -> ThreadPoolExecutor:
+    """Background worker for GitHub backups. A single worker keeps pushes in order,
+    since each PUT needs the sha left behind by the previous one.
+    """
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="github-backup")
+
+
+@st.cache_resource
+def _github_backup_state() -> Dict[str, Any]:
+    """Coalesces backup requests: at most one push job is queued or running at a time."""
+    return {"lock": threading.Lock(), "dirty": False, "future": None}
+
+
+def _github_backup_worker(state: Dict[str, Any], mirror: Dict[str, Any], session) -> bool:
+    """Push the newest CSV until no submission has arrived since the last push started.
+    Each PUT replaces the whole file, so intermediate snapshots are never worth sending.
+    Runs on the executor thread, so everything it needs is passed in: it must not call
+    Streamlit (including cached resources) outside a script run.
+    """
+    ok = False
+    while True:
+        with state["lock"]:
+            if not state["dirty"]:
+                state["future"] = None
+                return ok
+            state["dirty"] = False
+        try:
+            ok = push_csv_to_github(csv_bytes_for_backup(mirror), session)
+        except Exception:
+            ok = False
+
+
+def schedule_github_backup():
+    """Mark the CSV as needing a backup and return the future of the job that will push it."""
+    state = _github_backup_state()
+    mirror = _csv_mirror()
+    session = _github_http_session() if requests is not None else None
+    executor = _github_backup_executor()
+    with state["lock"]:
+        state["dirty"] = True
+        if state["future"] is None:
+            state["future"] = executor.submit(_github_backup_worker, state, mirror, session)
+        return state["future"]
+
+
+def push_csv_to_github(csv_bytes: bytes, session=None) -> bool:
     """Push the CSV bytes to the configured repo path using GITHUB_TOKEN.
     If no credentials are set, this is a no-op that returns False.
     This avoids requiring external accounts unless you explicitly set a token.
+    Pass `session` when calling from a background thread.
     """
-    if not GITHUB_TOKEN or not GITHUB_REPO:
+    if not GITHUB_TOKEN or not GITHUB_REPO or requests is None:
         return False
-    import base64
-    import json
-    import requests
 
     try:
+        if session is None:
+            session = _github_http_session()
         api_url = f"https://api.github.com/repos/{GITHUB_REPO}/contents/{GITHUB_PATH}"
         headers = {"Authorization": f"token {GITHUB_TOKEN}", "Accept": "application/vnd.github+json"}
         # Get current file sha if exists
-        get_resp = requests.get(api_url + f"?ref={GITHUB_BRANCH}", headers=headers)
+        get_resp = session.get(api_url + f"?ref={GITHUB_BRANCH}", headers=headers, timeout=10)
         if get_resp.status_code == 200:
             sha = get_resp.json().get("sha")
         else:
@@ -90,7 +274,7 @@ def push_csv_to_github(csv_bytes: bytes) -> bool:
         }
         if sha:
             payload["sha"] = sha
-        put_resp = requests.put(api_url, headers=headers, data=json.dumps(payload))
+        put_resp = session.put(api_url, headers=headers, json=payload, timeout=10)
         return put_resp.status_code in (201, 200)
     except Exception:
         return False
@@ -115,7 +299,7 @@ def create_local_backup(data_file: Path = DATA_FILE, backup_dir: Path = BACKUP_D
         if not data_file.exists():
             return False
         backup_dir.mkdir(parents=True, exist_ok=True)
-        ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        ts = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
         backup_file = backup_dir / f"{data_file.stem}_{ts}{data_file.suffix}"
         shutil.copy2(data_file, backup_file)
         # Rotate old backups, keep the newest `keep_last` files
@@ -131,104 +315,134 @@ def create_local_backup(data_file: Path = DATA_FILE, backup_dir: Path = BACKUP_D
 
 # ----------------- PARTNER OPENING MESSAGES -----------------
 # Openers depend on timing (early/gradual) and reciprocity style.
-# Each entry has a starting depth (0 or 1) and a list of possible messages.
+# Each entry has a starting depth (0 or 1) and a tuple of possible messages.
 PARTNER_OPENINGS = {
     "early": {
         "reciprocal": {
             "depth": 1,  # shallow
-            "messages": [
+            "messages": (
                 "Hey, nice to meet you. This week has been busy with classes, but I actually like meeting new people.",
                 "Hi! I’ve been running around with school stuff, but it’s nice to take a break and talk to someone.",
-            ],
+            ),
         },
         "guarded": {
             "depth": 0,  # very surface level
-            "messages": [
+            "messages": (
                 "Hey, nice to meet you. I’ve mostly just been going to class and trying to stay on top of things.",
                 "Hi! Nothing too exciting here—just the usual lectures and problem sets.",
-            ],
+            ),
         },
     },
     "gradual": {
         "reciprocal": {
             "depth": 0,
-            "messages": [
+            "messages": (
                 "Hey, nice to meet you. I’m usually a little quiet at first but I warm up once I get talking to someone.",
                 "Hi! I can be a bit shy early on, but I do enjoy getting to know people gradually.",
-            ],
+            ),
         },
         "guarded": {
             "depth": 0,
-            "messages": [
+            "messages": (
                 "Hi, nice to meet you. I’m generally more of a listener than a talker when I first meet someone.",
                 "Hey. I don’t usually share a lot about myself right away, but I’m fine chatting a bit.",
-            ],
+            ),
         },
     },
 }
 
+# Flattened view for the per-turn lookup: (timing, reciprocity) -> (depth, messages)
+_OPENING_BY_COND = {
+    (timing, reciprocity): (info["depth"], info["messages"])
+    for timing, by_reciprocity in PARTNER_OPENINGS.items()
+    for reciprocity, info in by_reciprocity.items()
+}
+
 # ----------------- PARTNER CONTENT MESSAGES -----------------
 # Pure content by depth: 0 = surface, 1 = a bit personal, 2 = more vulnerable.
 PARTNER_CONTENT = {
-    0: [
+    0: (
         "I’ve mostly just been bouncing between classes and the dining hall lately.",
         "My days have been pretty routine—class, homework, and trying not to fall asleep in lectures.",
         "Nothing too wild going on, just a lot of readings and assignments to get through.",
         "I spend a lot of time scrolling on my phone between things instead of doing anything interesting.",
-    ],
-    1: [
+    ),
+    1: (
         "Outside of work, I like watching shows and going on walks when the weather isn’t awful.",
         "When I get a break, I usually end up hanging out with friends or playing games in someone’s room.",
         "I really like finding new music and making playlists—it’s kind of my default hobby.",
         "I try to go to the gym a couple times a week, but I’m not always consistent about it.",
         "I’m studying subjects that are pretty intense, so I really value the little relaxing moments I get.",
-    ],
-    2: [
+    ),
+    2: (
         "I’ve had times here where I’ve felt really overwhelmed and worried I wouldn’t be able to keep up.",
         "Sometimes I feel like everyone else has things figured out and I’m just faking it.",
         "I’ve gone through stretches where I felt pretty isolated, even though I was surrounded by people.",
         "Balancing expectations from family with what I actually want has been really stressful at times.",
         "There have been moments where I seriously questioned whether I belong here as much as other people.",
         "I’m still figuring out how to talk about stress and mental health without feeling like I’m a burden.",
-    ],
+    ),
 }
 
 # ----------------- SESSION STATE INIT -----------------
-if "initialized" not in st.session_state:
-    st.session_state.initialized = False
-
-if "used_partner_messages" not in st.session_state:
-    st.session_state.used_partner_messages = set()  # to avoid exact repeats
+for _key, _default in (
+    ("initialized", False),
+    ("available_partner_messages", {}),  # shuffled pools, to avoid exact repeats
+    ("local_backup_on_submit", BACKUP_ON_SUBMIT),
+    ("local_backup_keep_last", BACKUP_KEEP_LAST),
+):
+    st.session_state.setdefault(_key, _default)
 
 
 # ----------------- HELPER FUNCTIONS -----------------
+_DEPTH_LABELS = (
+    "kept things very surface-level",
+    "shared a little personal information",
+    "shared something pretty personal or vulnerable",
+)
+
+TOTAL_TURNS = 6  # participant turns per conversation
+
+# Between-subjects conditions: (timing, reciprocity)
+CONDITIONS = (
+    ("early", "reciprocal"),
+    ("early", "guarded"),
+    ("gradual", "reciprocal"),
+    ("gradual", "guarded"),
+)
+
+# Depth options offered to the participant as natural language (no numbers shown)
+DEPTH_CHOICE_LABELS = (
+    "I would keep it very surface-level and not share anything personal.",
+    "I would share something a little personal, but not very deep.",
+    "I would share something pretty personal or vulnerable.",
+)
+LABEL_TO_DEPTH = {label: depth for depth, label in enumerate(DEPTH_CHOICE_LABELS)}
+
+
 def depth_to_label(depth: int) -> str:
     """Human-readable description of a depth level (no numbers shown to participant)."""
-    return {
-        0: "kept things very surface-level",
-        1: "shared a little personal information",
-        2: "shared something pretty personal or vulnerable",
-    }[depth]
-
-
-def choose_unique_message(candidates):
-    """Choose a message from candidates, avoiding exact repeats within this conversation."""
-    used = st.session_state.used_partner_messages
-    fresh = [m for m in candidates if m not in used]
-    if fresh:
-        msg = random.choice(fresh)
-    else:
-        msg = random.choice(candidates)
-    used.add(msg)
-    st.session_state.used_partner_messages = used
-    return msg
+    return _DEPTH_LABELS[depth]
+
+
+def choose_unique_message(bucket_key, candidates):
+    """Choose a message from candidates, avoiding exact repeats within this conversation.
+
+    Each bucket keeps a shuffled list of candidate indices; popping from the tail
+    hands out messages without repeats until the pool runs dry, then it is reshuffled.
+    """
+    pools = st.session_state.available_partner_messages
+    pool = pools.get(bucket_key)
+    if not pool:
+        pool = st.session_state.rng.sample(range(len(candidates)), len(candidates))
+        pools[bucket_key] = pool
+    return candidates[pool.pop()]
 
 
 def choose_opening_message(timing: str, reciprocity: str):
     """Pick opening depth and message based on condition."""
-    info = PARTNER_OPENINGS[timing][reciprocity]
-    depth = info["depth"]  # 0 or 1
-    message = choose_unique_message(info["messages"])
+    depth, messages = _OPENING_BY_COND[(timing, reciprocity)]  # depth is 0 or 1
+    message = choose_unique_message(("opening", timing, reciprocity), messages)
     return depth, message
 
 
@@ -237,7 +451,7 @@ def build_partner_message(partner_depth: int) -> str:
     Build a partner message for a given depth.
     No explicit talk about matching; just content that reflects how open they’re being.
     """
-    return choose_unique_message(PARTNER_CONTENT[partner_depth])
+    return choose_unique_message(partner_depth, PARTNER_CONTENT[partner_depth])
 
 
 
@@ -245,13 +459,12 @@ def build_partner_message(partner_depth: int) -> str:
 
 def init_game():
     """Initialize a new game for this participant, with partner starting first."""
+    # Per-session generator: keeps this participant's draws independent of other
+    # sessions, and can be seeded to replay a conversation when debugging
+    st.session_state.rng = random.Random()
+
     # Randomly assign condition: (timing, reciprocity)
-    timing, reciprocity = random.choice([
-        ("early", "reciprocal"),
-        ("early", "guarded"),
-        ("gradual", "reciprocal"),
-        ("gradual", "guarded"),
-    ])
+    timing, reciprocity = st.session_state.rng.choice(CONDITIONS)
     st.session_state.timing = timing
     st.session_state.reciprocity = reciprocity
 
@@ -260,7 +473,7 @@ def init_game():
     st.session_state.history = []  # list of dicts per turn
     st.session_state.finished = False
     st.session_state.initialized = True
-    st.session_state.used_partner_messages = set()
+    st.session_state.available_partner_messages = {}
 
     # Partner opening move (always shallow or less; never deep)
     opening_depth, opening_message = choose_opening_message(timing, reciprocity)
@@ -331,16 +544,12 @@ netid = st.text_input("Your name or NetID (e.g., ab1234):", "")
 # Sidebar controls for downloads and backups (accessible to any visitor).
 
 # Public toggle for creating backups on submissions (stored in session_state for convenience)
-if "local_backup_on_submit" not in st.session_state:
-    st.session_state.local_backup_on_submit = BACKUP_ON_SUBMIT
 st.session_state.local_backup_on_submit = st.sidebar.checkbox(
     "Create local timestamped backup on each new submission",
     value=st.session_state.local_backup_on_submit,
 )
 
 # Keep-last setting
-if "local_backup_keep_last" not in st.session_state:
-    st.session_state.local_backup_keep_last = BACKUP_KEEP_LAST
 st.session_state.local_backup_keep_last = st.sidebar.number_input(
     "Keep this many local backups",
     min_value=1,
@@ -370,10 +579,10 @@ try:
             st.sidebar.subheader("Local CSV backups")
             for bf in backup_files[:10]:
                 try:
-                    bts = bf.stat().st_mtime
-                    st.sidebar.write(f"{bf.name} — {datetime.utcfromtimestamp(bts).isoformat()} UTC")
-                    with open(bf, "rb") as _bf:
-                        st.sidebar.download_button(label=f"Download {bf.name}", data=_bf.read(), file_name=bf.name, mime="text/csv")
+                    bst = bf.stat()
+                    bts = bst.st_mtime
+                    st.sidebar.write(f"{bf.name} — {datetime.fromtimestamp(bts, timezone.utc).isoformat(timespec='seconds')}")
+                    st.sidebar.download_button(label=f"Download {bf.name}", data=_read_csv_bytes(str(bf), (bst.st_mtime_ns, bst.st_size)), file_name=bf.name, mime="text/csv")
                 except Exception:
                     pass
 except Exception:
@@ -382,18 +591,24 @@ except Exception:
 # Show total rows and simple download button for all users
 total_rows = 0
 try:
-    if DATA_FILE.exists():
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            total_rows = sum(1 for _ in f) - 1  # subtract header
+    total_rows = count_saved_rows()
 except Exception:
     total_rows = 0
 st.sidebar.info(f"Submissions saved on server: {max(total_rows,0)}")
 
+# Report the outcome of this session's last background GitHub backup, once it has finished
+_backup_future = st.session_state.get("github_backup_future")
+if _backup_future is not None and _backup_future.done():
+    del st.session_state["github_backup_future"]
+    if _backup_future.result():
+        st.sidebar.info("CSV backed up to GitHub repository")
+    else:
+        st.sidebar.warning("GitHub backup of the CSV failed")
+
 # Single-download button for all users
 if DATA_FILE.exists():
     try:
-        with open(DATA_FILE, "rb") as f:
-            csv_bytes = f.read()
+        csv_bytes = _read_csv_bytes(str(DATA_FILE), _file_version(DATA_FILE))
         st.sidebar.download_button(
             label="Download collected data CSV",
             data=csv_bytes,
@@ -406,47 +621,47 @@ else:
     st.sidebar.info("No data file yet (no submissions recorded).")
 
 # Data Viewer expander: full table and download
-with st.sidebar.expander("View and download all submissions"):
-    try:
-        if DATA_FILE.exists():
-            with open(DATA_FILE, "r", encoding="utf-8") as _f:
-                reader = csv.DictReader(_f)
-                rows = list(reader)
-        else:
-            rows = []
-
-        st.sidebar.write(f"Total submissions: {len(rows)}")
-        st.sidebar.dataframe(rows)
-        # Convert rows (list of dicts) to CSV bytes
-        import io as _io
-        if rows:
-            buf = _io.StringIO()
-            w = csv.DictWriter(buf, fieldnames=CSV_HEADERS)
-            w.writeheader()
-            w.writerows(rows)
-            csv_bytes_all = buf.getvalue().encode("utf-8")
-        else:
-            csv_bytes_all = b""
-        st.download_button(
-            label="Download full CSV",
-            data=csv_bytes_all,
-            file_name="disclosure_game_all_submissions.csv",
-            mime="text/csv",
-        )
-    except Exception:
-        # If file read fails, try the raw CSV bytes copy
-        if DATA_FILE.exists():
-            try:
-                with open(DATA_FILE, "rb") as _f:
-                    _csv_bytes = _f.read()
-                st.download_button(
-                    label="Download CSV file",
-                    data=_csv_bytes,
-                    file_name="disclosure_game_data.csv",
-                    mime="text/csv",
-                )
-            except Exception:
-                st.warning("Unable to load the data for viewing or download.")
+@st.fragment
+def submissions_viewer():
+    """Expander with the full submissions table and download.
+    Runs as a fragment so the toggle only reruns this block, and the table is
+    only parsed and sent to the browser while the visitor has it switched on.
+    """
+    with st.expander("View and download all submissions"):
+        try:
+            if st.toggle("Show submissions table", key="show_submissions_table"):
+                if DATA_FILE.exists():
+                    rows = load_rows(str(DATA_FILE), _file_version(DATA_FILE))
+                else:
+                    rows = []
+
+                st.write(f"Total submissions: {len(rows)}")
+                st.dataframe(rows)
+            # The file on disk already is the CSV; no need to re-serialize the parsed rows
+            csv_bytes_all = _read_csv_bytes(str(DATA_FILE), _file_version(DATA_FILE)) if DATA_FILE.exists() else b""
+            st.download_button(
+                label="Download full CSV",
+                data=csv_bytes_all,
+                file_name="disclosure_game_all_submissions.csv",
+                mime="text/csv",
+            )
+        except Exception:
+            # If file read fails, try the raw CSV bytes copy
+            if DATA_FILE.exists():
+                try:
+                    _csv_bytes = _read_csv_bytes(str(DATA_FILE), _file_version(DATA_FILE))
+                    st.download_button(
+                        label="Download CSV file",
+                        data=_csv_bytes,
+                        file_name="disclosure_game_data.csv",
+                        mime="text/csv",
+                    )
+                except Exception:
+                    st.warning("Unable to load the data for viewing or download.")
+
+
+with st.sidebar:
+    submissions_viewer()
 
 if not st.session_state.initialized:
     if st.button("Start conversation"):
@@ -461,12 +676,11 @@ if st.session_state.initialized:
 
     st.subheader("Conversation")
 
-    total_turns = 6
     # For the progress bar, if finished, show 100%
     if st.session_state.finished:
         progress_fraction = 1.0
     else:
-        progress_fraction = (st.session_state.turn - 1) / total_turns
+        progress_fraction = (st.session_state.turn - 1) / TOTAL_TURNS
     st.progress(progress_fraction)
 
     # Opening partner message
@@ -487,26 +701,13 @@ if st.session_state.initialized:
 if st.session_state.initialized and not st.session_state.finished:
 
     current_turn = st.session_state.turn
-    total_turns = 6
-
-    if current_turn <= total_turns:
-        st.markdown(f"### Your turn (Turn {current_turn} of {total_turns})")
-
-        # Depth options as natural language (no numbers shown)
-        depth_labels = [
-            "I would keep it very surface-level and not share anything personal.",
-            "I would share something a little personal, but not very deep.",
-            "I would share something pretty personal or vulnerable.",
-        ]
-        label_to_depth = {
-            depth_labels[0]: 0,
-            depth_labels[1]: 1,
-            depth_labels[2]: 2,
-        }
+
+    if current_turn <= TOTAL_TURNS:
+        st.markdown(f"### Your turn (Turn {current_turn} of {TOTAL_TURNS})")
 
         choice_label = st.radio(
             "If you were replying to your partner right now, how personal would you be?",
-            depth_labels,
+            DEPTH_CHOICE_LABELS,
             index=None,
             key=f"choice_{current_turn}",
         )
@@ -515,7 +716,7 @@ if st.session_state.initialized and not st.session_state.finished:
             if choice_label is None:
                 st.warning("Please choose one of the options before continuing.")
             else:
-                participant_depth = label_to_depth[choice_label]
+                participant_depth = LABEL_TO_DEPTH[choice_label]
 
                 # Decide partner's next depth based on policy
                 timing = st.session_state.timing
@@ -540,7 +741,7 @@ if st.session_state.initialized and not st.session_state.finished:
 
                 # Advance to next turn or mark finished
                 st.session_state.turn += 1
-                if st.session_state.turn > total_turns:
+                if st.session_state.turn > TOTAL_TURNS:
                     st.session_state.finished = True
 
 # ----------------- POST-CONVERSATION QUESTIONS -----------------
@@ -569,7 +770,7 @@ if st.session_state.initialized and st.session_state.finished:
     )
 
     if st.button("Submit and save data"):
-        timestamp = datetime.utcnow().isoformat()
+        timestamp = datetime.now(timezone.utc).isoformat(timespec="seconds")
         netid_value = st.session_state.netid
         timing = st.session_state.timing
         reciprocity = st.session_state.reciprocity
@@ -582,49 +783,52 @@ if st.session_state.initialized and st.session_state.finished:
             except Exception:
                 pass
 
-            with open(DATA_FILE, "a", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                _rows_for_supabase = []
-                for entry in st.session_state.history:
-                    row = [
-                        timestamp,
-                        netid_value,
-                        timing,
-                        reciprocity,
-                        entry["turn"],
-                        entry["participant_depth"],
-                        entry["partner_depth"],
-                        entry["partner_message"],
-                        trust,
-                        closeness,
-                        comfort,
-                        warmth,
-                        perceived_openness,
-                        reciprocity_rating,
-                        enjoyment,
-                        strategy_adjustment,
-                        strategy_text,
-                    ]
-                    writer.writerow(row)
-                    # Append to list for optional Supabase insert
-                    _rows_for_supabase.append({CSV_HEADERS[i]: row[i] for i in range(len(CSV_HEADERS))})
-                # If Supabase configured, insert these rows remotely too
-                # If a GitHub token + repo is configured, back up CSV to GitHub
-                try:
-                    with open(DATA_FILE, "rb") as _backup_f:
-                        _csv_bytes_local = _backup_f.read()
-                    if GITHUB_TOKEN and GITHUB_REPO:
-                        pushed = push_csv_to_github(_csv_bytes_local)
-                        if pushed:
-                            st.info("CSV backed up to GitHub repository")
-                except Exception:
-                    # Non-fatal: backups are best-effort
-                    pass
+            # One row per turn; built up front so the file sees a single batched write
+            rows = [
+                [
+                    timestamp,
+                    netid_value,
+                    timing,
+                    reciprocity,
+                    entry["turn"],
+                    entry["participant_depth"],
+                    entry["partner_depth"],
+                    entry["partner_message"],
+                    trust,
+                    closeness,
+                    comfort,
+                    warmth,
+                    perceived_openness,
+                    reciprocity_rating,
+                    enjoyment,
+                    strategy_adjustment,
+                    strategy_text,
+                ]
+                for entry in st.session_state.history
+            ]
+            # Serialize in memory first so the append is one contiguous write()
+            if FAST_CSV_ROWS:
+                data = "".join(_format_row(row) for row in rows).encode("utf-8")
+            else:
+                buf = io.StringIO()
+                writer = csv.writer(buf)
+                writer.writerows(rows)
+                data = buf.getvalue().encode("utf-8")
+            append_to_data_file(data)
+            # If a GitHub token + repo is configured, back up CSV to GitHub
+            # The push runs in the background; its result is reported on a later rerun.
+            try:
+                if GITHUB_TOKEN and GITHUB_REPO:
+                    st.session_state.github_backup_future = schedule_github_backup()
+            except Exception:
+                # Non-fatal: backups are best-effort
+                pass
         except Exception as e:
             st.error("Unable to save data on the server. The file system may be read-only or there was another error.")
             st.exception(e)
             st.markdown("If you repeatedly see this error on the deployed app, consider using a remote database or set the `DATA_FILE_PATH` environment variable to a writable location.")
             # Debug print trace to server logs for deploy troubleshooting
+            import traceback
             traceback.print_exc()
             # Do not try to continue; leave state as-is so a retry won't lose data
             raise
@@ -640,7 +844,7 @@ if st.session_state.initialized and st.session_state.finished:
         st.session_state.finished = False
         st.session_state.history = []
         st.session_state.turn = 1
-        st.session_state.used_partner_messages = set()
+        st.session_state.available_partner_messages = {}
 
         # Note: writing to the CSV on the server does not sync to GitHub.
         # For long-term storage, set up a database or a secure remote store.